@@ -34,9 +34,12 @@ Before running this script you must install the required third party
 packages:
 
 ```
-pip install discord.py aiohttp aiosqlite fastapi uvicorn python‑dotenv
+pip install discord.py aiohttp aiosqlite fastapi uvicorn python‑dotenv orjson
 ```
 
+On Linux and macOS, also installing `uvloop` makes the bot run on its
+faster event loop.
+
 You will also need to create the following environment variables:
 
 * **DISCORD_TOKEN:** The token for your Discord bot.
@@ -67,21 +70,33 @@ Copyright 2025 David.
 """
 
 import asyncio
+import functools
+import itertools
 import json
 import logging
 import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Hashable, Iterable, List, Optional, Tuple
 
 import aiohttp
 import aiosqlite
 import discord
+import orjson
 from discord import Intents, Member, Role
 from discord.ext import commands, tasks
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import StreamingResponse
 import uvicorn
 
+try:
+    import uvloop
+except ImportError:  # uvloop is optional and not available on Windows
+    uvloop = None
+
 
 ###############################################################################
 # Database helpers
@@ -92,99 +107,533 @@ import uvicorn
 DB_PATH = os.environ.get("ERLC_BOT_DB", "erlc_bot.db")
 
 
-async def init_db() -> None:
+# Connection tuning applied to every connection in the pool.  With WAL,
+# `synchronous=NORMAL` is still durable against application crashes, and each
+# connection keeps its own ~20MB page cache.
+SQLITE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=ON",
+)
+
+# sqlite3 keeps compiled statements in a per-connection LRU keyed by the SQL
+# text.  128 is already its default; it is spelled out so the pool's
+# connections do not depend on it.  The queries below are shared constants so
+# every call site passes the same text and hits that cache.
+SQLITE_STATEMENT_CACHE = 128
+
+SQL_LINK_ACCOUNT = (
+    "REPLACE INTO linked_accounts (discord_id, roblox_id, roblox_username) VALUES (?, ?, ?)"
+)
+SQL_GET_LINKED_ACCOUNT = "SELECT roblox_id, roblox_username FROM linked_accounts WHERE discord_id = ?"
+SQL_ALL_LINKS = "SELECT roblox_id, discord_id FROM linked_accounts"
+SQL_INSERT_SHIFT = "INSERT INTO shift_logs (discord_id, start_time, end_time) VALUES (?, ?, ?)"
+SQL_OPEN_SHIFT = (
+    "SELECT id FROM shift_logs WHERE discord_id = ? AND end_time IS NULL ORDER BY start_time DESC LIMIT 1"
+)
+SQL_CLOSE_SHIFT = "UPDATE shift_logs SET end_time = ? WHERE id = ?"
+SQL_LIST_SHIFTS = (
+    "SELECT discord_id, start_time, end_time FROM shift_logs ORDER BY start_time DESC LIMIT ? OFFSET ?"
+)
+
+
+class SQLitePool:
+    """A single read/write connection plus a pool of read-only connections.
+
+    The database runs in WAL mode, where readers never block the writer and
+    vice versa.  Long reads such as the `/api/shifts` export therefore run on
+    their own connection alongside shift updates instead of queueing behind
+    them.  SQLite only allows one writer at a time, so all writes share one
+    connection guarded by a lock.
+    """
+
+    def __init__(self, writer: aiosqlite.Connection, readers: List[aiosqlite.Connection]) -> None:
+        self._writer = writer
+        self._write_lock = asyncio.Lock()
+        self._all_readers = readers
+        self._readers: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
+        for reader in readers:
+            self._readers.put_nowait(reader)
+
+    @classmethod
+    async def open(cls, path: str = DB_PATH, readers: int = 4) -> "SQLitePool":
+        """Open the pool and ensure the schema exists.
+
+        The writer is opened first: it creates the database file and switches
+        it to WAL mode, which read-only connections cannot do themselves.
+        """
+        writer = await aiosqlite.connect(path, cached_statements=SQLITE_STATEMENT_CACHE)
+        await writer.execute("PRAGMA journal_mode=WAL")
+        for pragma in SQLITE_PRAGMAS:
+            await writer.execute(pragma)
+        pool = cls(writer, [])
+        await init_db(pool)
+        uri = f"{Path(path).resolve().as_uri()}?mode=ro"
+        for _ in range(readers):
+            reader = await aiosqlite.connect(uri, uri=True, cached_statements=SQLITE_STATEMENT_CACHE)
+            for pragma in SQLITE_PRAGMAS:
+                await reader.execute(pragma)
+            pool._all_readers.append(reader)
+            pool._readers.put_nowait(reader)
+        return pool
+
+    async def close(self) -> None:
+        for reader in self._all_readers:
+            await reader.close()
+        await self._writer.close()
+
+    @asynccontextmanager
+    async def read(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a read-only connection for the duration of the block."""
+        db = await self._readers.get()
+        try:
+            yield db
+        finally:
+            self._readers.put_nowait(db)
+
+    @asynccontextmanager
+    async def write(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Run the enclosed statements in a single write transaction.
+
+        The transaction is opened with `BEGIN IMMEDIATE` so the write lock is
+        taken up front; a deferred transaction that later upgrades from a read
+        can fail with SQLITE_BUSY instead of waiting on `busy_timeout`.
+        """
+        async with self._write_lock:
+            db = self._writer
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+                await db.commit()
+            except BaseException:
+                # Also covers a failed commit, which would otherwise leave the
+                # shared writer stuck inside an open transaction
+                await db.rollback()
+                raise
+
+    async def executescript(self, script: str) -> None:
+        """Run a multi-statement SQL script on the writer.
+
+        The script manages its own transaction, since `executescript` commits
+        any transaction that is already open before it starts.
+        """
+        async with self._write_lock:
+            try:
+                await self._writer.executescript(script)
+            except BaseException:
+                await self._writer.rollback()
+                raise
+
+
+# Schema, applied as one script in a single transaction at startup
+SCHEMA_SQL = """
+BEGIN IMMEDIATE;
+CREATE TABLE IF NOT EXISTS linked_accounts (
+    discord_id TEXT PRIMARY KEY,
+    roblox_id TEXT NOT NULL,
+    roblox_username TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS shift_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    discord_id TEXT NOT NULL,
+    start_time TIMESTAMP NOT NULL,
+    end_time TIMESTAMP
+);
+-- Lets the dashboard listing walk the index instead of sorting the table
+CREATE INDEX IF NOT EXISTS idx_shift_start ON shift_logs (start_time DESC);
+-- Only open shifts are ever looked up per user, so index just those
+CREATE INDEX IF NOT EXISTS idx_shift_open ON shift_logs (discord_id, start_time DESC)
+    WHERE end_time IS NULL;
+-- Reverse lookups from a Roblox account to the linked Discord user
+CREATE INDEX IF NOT EXISTS idx_linked_roblox ON linked_accounts (roblox_id);
+COMMIT;
+"""
+
+
+async def init_db(pool: SQLitePool) -> None:
     """Initialise the SQLite database.
 
     Creates tables for linked accounts and shift logs if they do not already
     exist.  Linked accounts map a Discord user ID to a Roblox user ID.  Shift
     logs track when a member begins or ends their shift.
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS linked_accounts (
-                discord_id TEXT PRIMARY KEY,
-                roblox_id TEXT NOT NULL,
-                roblox_username TEXT NOT NULL
-            )
-            """
-        )
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS shift_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                discord_id TEXT NOT NULL,
-                start_time TIMESTAMP NOT NULL,
-                end_time TIMESTAMP
-            )
-            """
-        )
-        await db.commit()
+    await pool.executescript(SCHEMA_SQL)
 
 
-async def link_account(discord_id: int, roblox_id: int, roblox_username: str) -> None:
+async def link_account(
+    pool: SQLitePool, discord_id: int, roblox_id: int, roblox_username: str
+) -> None:
     """Link a Discord user ID to a Roblox ID.
 
     If the entry already exists it will be replaced.
     """
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with pool.write() as db:
         await db.execute(
-            "REPLACE INTO linked_accounts (discord_id, roblox_id, roblox_username) VALUES (?, ?, ?)",
+            SQL_LINK_ACCOUNT,
             (str(discord_id), str(roblox_id), roblox_username),
         )
-        await db.commit()
 
 
-async def get_linked_account(discord_id: int) -> Optional[Tuple[str, str]]:
+async def link_accounts_bulk(pool: SQLitePool, rows: Iterable[Tuple[int, int, str]]) -> None:
+    """Link many `(discord_id, roblox_id, roblox_username)` rows at once.
+
+    All rows are written in one transaction through a single compiled
+    statement.  From a running bot use `ERLCDiscordBot.import_links`, which
+    also updates the bot's in-memory link index.
+    """
+    async with pool.write() as db:
+        await db.executemany(
+            SQL_LINK_ACCOUNT,
+            [(str(discord_id), str(roblox_id), username) for discord_id, roblox_id, username in rows],
+        )
+
+
+async def get_linked_account(pool: SQLitePool, discord_id: int) -> Optional[Tuple[str, str]]:
     """Retrieve the Roblox ID and username for a given Discord user.
 
     Returns a tuple `(roblox_id, roblox_username)` or None if the user is not
     linked.
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        async with db.execute(
-            "SELECT roblox_id, roblox_username FROM linked_accounts WHERE discord_id = ?",
-            (str(discord_id),),
-        ) as cursor:
+    async with pool.read() as db:
+        async with db.execute(SQL_GET_LINKED_ACCOUNT, (str(discord_id),)) as cursor:
             row = await cursor.fetchone()
             return (row[0], row[1]) if row else None
 
 
-async def start_shift(discord_id: int) -> None:
-    """Record the start of a shift for a Discord user."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            "INSERT INTO shift_logs (discord_id, start_time, end_time) VALUES (?, ?, NULL)",
-            (str(discord_id), datetime.utcnow()),
-        )
-        await db.commit()
+class LinkIndex:
+    """In-memory mirror of `linked_accounts` for lookups by Roblox ID.
+
+    Both directions are kept so that replacing a user's link is O(1).  Several
+    Discord users may link the same Roblox account; `get` returns the one who
+    linked most recently, and the others stay indexed if that user relinks.
+    """
+
+    def __init__(self) -> None:
+        self._roblox_by_discord: Dict[int, str] = {}
+        # Dicts used as insertion-ordered sets of Discord IDs
+        self._discord_by_roblox: Dict[str, Dict[int, None]] = {}
+
+    def __contains__(self, roblox_id: object) -> bool:
+        return str(roblox_id) in self._discord_by_roblox
+
+    def get(self, roblox_id: Any) -> Optional[int]:
+        """Return the Discord ID linked to a Roblox ID, or None."""
+        linked = self._discord_by_roblox.get(str(roblox_id))
+        return next(reversed(linked)) if linked else None
+
+    def add(self, discord_id: int, roblox_id: Any) -> None:
+        """Record a link, replacing any previous link for the Discord user."""
+        roblox_id = str(roblox_id)
+        previous = self._roblox_by_discord.get(discord_id)
+        if previous is not None:
+            linked = self._discord_by_roblox[previous]
+            del linked[discord_id]
+            if not linked:
+                del self._discord_by_roblox[previous]
+        self._roblox_by_discord[discord_id] = roblox_id
+        self._discord_by_roblox.setdefault(roblox_id, {})[discord_id] = None
+
+
+async def load_link_index(pool: SQLitePool) -> LinkIndex:
+    """Load every linked account into a `LinkIndex`."""
+    index = LinkIndex()
+    async with pool.read() as db:
+        async with db.execute(SQL_ALL_LINKS) as cursor:
+            async for roblox_id, discord_id in cursor:
+                index.add(int(discord_id), roblox_id)
+    return index
+
+
+# A queued shift action: ("start" or "end", Discord ID, time, completion future)
+ShiftEvent = Tuple[str, str, datetime, "asyncio.Future[None]"]
+
+
+class ShiftLogWriter:
+    """Write-behind queue that group-commits shift starts and ends.
+
+    Shift commands enqueue an event and wait until it has been committed.  A
+    single consumer task collects the events that arrive within `max_delay`
+    seconds (up to `max_batch` of them) and applies them in one write
+    transaction, so a squad starting their shifts together costs one commit
+    rather than one each.
+    """
+
+    def __init__(self, pool: SQLitePool, max_batch: int = 64, max_delay: float = 0.05) -> None:
+        self.pool = pool
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: "asyncio.Queue[ShiftEvent]" = asyncio.Queue()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def start(self) -> None:
+        """Start the consumer task."""
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Flush queued events and stop the consumer task."""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def start_shift(self, discord_id: int) -> None:
+        """Record the start of a shift for a Discord user."""
+        await self._submit("start", discord_id)
+
+    async def end_shift(self, discord_id: int) -> None:
+        """Record the end of a shift for a Discord user.
+
+        This will update the most recent open shift for the user.  If no open shift
+        exists then a new one is created with both start and end times equal.
+        """
+        await self._submit("end", discord_id)
+
+    async def _submit(self, kind: str, discord_id: int) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((kind, str(discord_id), datetime.utcnow(), future))
+        await future
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            # Give other officers' commands a moment to join this commit
+            await asyncio.sleep(self.max_delay)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._apply(batch)
+            except Exception as exc:
+                logging.exception("Failed to write %d shift log event(s)", len(batch))
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+            else:
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _apply(self, batch: List[ShiftEvent]) -> None:
+        async with self.pool.write() as db:
+            # Events are applied in arrival order so that a start followed by
+            # an end for the same user within one batch closes that shift
+            for kind, events in itertools.groupby(batch, key=lambda event: event[0]):
+                if kind == "start":
+                    await db.executemany(
+                        SQL_INSERT_SHIFT,
+                        [(discord_id, ts, None) for _, discord_id, ts, _ in events],
+                    )
+                    continue
+                for _, discord_id, ts, _ in events:
+                    async with db.execute(SQL_OPEN_SHIFT, (discord_id,)) as cursor:
+                        row = await cursor.fetchone()
+                    if row:
+                        await db.execute(SQL_CLOSE_SHIFT, (ts, row[0]))
+                    else:
+                        # Create a zero‑length shift as a fallback
+                        await db.execute(SQL_INSERT_SHIFT, (discord_id, ts, ts))
 
 
-async def end_shift(discord_id: int) -> None:
-    """Record the end of a shift for a Discord user.
+###############################################################################
+# HTTP client helpers
+###############################################################################
+
+class TTLCache:
+    """Small in-process cache whose entries expire after `ttl` seconds.
 
-    This will update the most recent open shift for the user.  If no open shift
-    exists then a new one is created with both start and end times equal.
+    Concurrent lookups of a key that is not cached share a single in-flight
+    fetch, so a burst of identical requests costs one upstream call.  Only
+    results other than None are stored; failed lookups are retried on the
+    next call.
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        async with db.execute(
-            "SELECT id FROM shift_logs WHERE discord_id = ? AND end_time IS NULL ORDER BY start_time DESC LIMIT 1",
-            (str(discord_id),),
-        ) as cursor:
-            row = await cursor.fetchone()
-        if row:
-            shift_id = row[0]
-            await db.execute(
-                "UPDATE shift_logs SET end_time = ? WHERE id = ?",
-                (datetime.utcnow(), shift_id),
-            )
+
+    def __init__(self, ttl: float, maxsize: int = 4096) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires > time.monotonic():
+                return value
+            del self._entries[key]
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fetch())
+            self._inflight[key] = future
+            future.add_done_callback(functools.partial(self._store, key))
+        # Shield so that one waiter being cancelled does not cancel the fetch
+        # the other waiters are sharing
+        return await asyncio.shield(future)
+
+    def _store(self, key: Hashable, future: "asyncio.Future[Any]") -> None:
+        del self._inflight[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        value = future.result()
+        if value is None:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+def _retry_after(resp: aiohttp.ClientResponse) -> Optional[float]:
+    """Return the delay requested by a `Retry-After` header, in seconds."""
+    try:
+        return float(resp.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+def _is_overloaded(resp: aiohttp.ClientResponse) -> bool:
+    """Whether a response means the upstream wants us to slow down."""
+    return resp.status == 429 or resp.status >= 500
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` requests per `period` seconds.
+
+    Once the bucket is empty `acquire` waits, in arrival order, for the next
+    token, so bursts are smoothed out to the configured rate before they
+    reach the upstream API.
+    """
+
+    def __init__(self, rate: float, period: float = 1.0) -> None:
+        self.capacity = rate
+        self._fill_rate = rate / period
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and consume it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._fill_rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._fill_rate)
+
+
+class CircuitOpenError(Exception):
+    """Raised by `AIMDController.slot` when the breaker opened while waiting."""
+
+
+class AIMDController:
+    """Adaptive concurrency limit and circuit breaker for one upstream API.
+
+    Works like TCP congestion control.  While the mean latency over the last
+    `window` calls stays within `target_latency`, the number of concurrent
+    calls allowed grows by `alpha` per call; otherwise it is multiplied by
+    `beta`.  A 429/5xx response or a network error also cuts the limit and
+    opens the breaker for `cooldown` seconds (or longer if the upstream sent
+    `Retry-After`).  While the breaker is open callers should fail fast
+    instead of making a request; `slot` raises `CircuitOpenError` if the
+    breaker opened while the caller was queued for a slot.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: float = 4.0,
+        max_limit: float = 16.0,
+        target_latency: float = 1.0,
+        alpha: float = 0.5,
+        beta: float = 0.5,
+        window: int = 20,
+        cooldown: float = 30.0,
+    ) -> None:
+        self.name = name
+        self.limit = initial_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.alpha = alpha
+        self.beta = beta
+        self.cooldown = cooldown
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._in_flight = 0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+        self._open_until = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the circuit breaker is currently rejecting calls."""
+        return time.monotonic() < self._open_until
+
+    def trip(self, retry_after: Optional[float] = None) -> None:
+        """Back off after the upstream reported overload."""
+        self.limit = max(1.0, self.limit * self.beta)
+        delay = max(self.cooldown, retry_after or 0.0)
+        self._open_until = time.monotonic() + delay
+        logging.warning("%s API overloaded; pausing requests for %.0fs", self.name, delay)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the concurrent call slots and time the call."""
+        await self._acquire()
+        if self.is_open:
+            # The breaker tripped while we were queued; do not make the call
+            self._in_flight -= 1
+            self._wake()
+            raise CircuitOpenError(self.name)
+        start = time.monotonic()
+        try:
+            yield
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.trip()
+            raise
+        finally:
+            self._in_flight -= 1
+            self._observe(time.monotonic() - start)
+            self._wake()
+
+    async def _acquire(self) -> None:
+        while self._in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # We were woken but will not take the slot; pass it on
+                    self._wake()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self._in_flight += 1
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self._in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def _observe(self, latency: float) -> None:
+        self._latencies.append(latency)
+        mean = sum(self._latencies) / len(self._latencies)
+        if mean <= self.target_latency:
+            self.limit = min(self.max_limit, self.limit + self.alpha)
         else:
-            # Create a zero‑length shift as a fallback
-            await db.execute(
-                "INSERT INTO shift_logs (discord_id, start_time, end_time) VALUES (?, ?, ?)",
-                (str(discord_id), datetime.utcnow(), datetime.utcnow()),
-            )
-        await db.commit()
+            self.limit = max(1.0, self.limit * self.beta)
 
 
 ###############################################################################
@@ -198,6 +647,9 @@ class ERLCClient:
     `/server/players`, `/server/vehicles`, `/server/joinlogs` and
     `/server/killlogs` are available【57767659559315†L221-L258】.  This client exposes
     methods for those endpoints and handles authentication headers.
+
+    Requests are paced by an `AIMDController`; while the API is reporting
+    overload the client returns None without making a request.
     """
 
     BASE_URL = "https://api.policeroleplay.community"
@@ -206,24 +658,36 @@ class ERLCClient:
         self.server_id = server_id
         self.server_key = server_key
         self.session = session
-
-    def _headers(self) -> Dict[str, str]:
-        return {
+        self.controller = AIMDController("ERLC")
+        # The server key does not change at runtime, so build headers once
+        self._cached_headers: Dict[str, str] = {
             "Server-Key": self.server_key,
             "Accept": "application/json",
         }
+        self._command_headers: Dict[str, str] = {
+            **self._cached_headers,
+            "Content-Type": "application/json",
+        }
 
     async def _get(self, endpoint: str) -> Any:
+        if self.controller.is_open:
+            return None
         url = f"{self.BASE_URL}/servers/{self.server_id}{endpoint}"
-        async with self.session.get(url, headers=self._headers()) as resp:
-            if resp.status != 200:
-                logging.error("ERLC API error on %s: HTTP %s", endpoint, resp.status)
-                return None
-            try:
-                return await resp.json()
-            except Exception:
-                logging.exception("Failed to decode JSON from ERLC API")
-                return None
+        try:
+            async with self.controller.slot():
+                async with self.session.get(url, headers=self._cached_headers) as resp:
+                    if _is_overloaded(resp):
+                        self.controller.trip(_retry_after(resp))
+                    if resp.status != 200:
+                        logging.error("ERLC API error on %s: HTTP %s", endpoint, resp.status)
+                        return None
+                    try:
+                        return orjson.loads(await resp.read())
+                    except Exception:
+                        logging.exception("Failed to decode JSON from ERLC API")
+                        return None
+        except CircuitOpenError:
+            return None
 
     async def server_info(self) -> Optional[Dict[str, Any]]:
         return await self._get("")
@@ -250,13 +714,26 @@ class ERLCClient:
         The `/server/command` endpoint accepts a POST with a JSON body
         containing the command.  According to the API pack documentation this
         endpoint will return success or failure【57767659559315†L292-L299】.
+
+        Returns True if the server accepted the command.
         """
+        if self.controller.is_open:
+            logging.error("Failed to run command '%s': ERLC API is backing off", command)
+            return False
         url = f"{self.BASE_URL}/servers/{self.server_id}/command"
-        payload = {"command": command}
-        async with self.session.post(url, json=payload, headers=self._headers()) as resp:
-            if resp.status != 200:
-                logging.error("Failed to run command '%s': HTTP %s", command, resp.status)
-                return False
+        payload = orjson.dumps({"command": command})
+        try:
+            async with self.controller.slot():
+                async with self.session.post(url, data=payload, headers=self._command_headers) as resp:
+                    if _is_overloaded(resp):
+                        self.controller.trip(_retry_after(resp))
+                    if resp.status != 200:
+                        logging.error("Failed to run command '%s': HTTP %s", command, resp.status)
+                        return False
+                    return True
+        except CircuitOpenError:
+            logging.error("Failed to run command '%s': ERLC API is backing off", command)
+            return False
 
 
 ###############################################################################
@@ -276,68 +753,151 @@ class RobloxClient:
         https://groups.roblox.com/v1/users/{user_id}/groups/roles
 
     which returns a list of the user's groups and roles.  Note that this
-    endpoint does not require authentication but is rate limited.  If you
-    receive HTTP 429 responses you may need to back off.
+    endpoint does not require authentication but is rate limited.  Results
+    are therefore cached for a short while, and requests are paced by an
+    `AIMDController` that stops calling Roblox after an HTTP 429 response.
     """
 
     GROUP_ROLES_URL = "https://groups.roblox.com/v1/users/{user_id}/groups/roles"
     USER_BY_USERNAME_URL = "https://api.roblox.com/users/get-by-username?username={username}"
 
+    # Group roles change on promotion, usernames almost never
+    GROUP_ROLES_TTL = 120
+    USER_ID_TTL = 3600
+    # Stay under the public API's rate limit and cap requests in flight
+    REQUESTS_PER_SECOND = 20
+    MAX_CONCURRENT_REQUESTS = 8
+
     def __init__(self, session: aiohttp.ClientSession) -> None:
         self.session = session
+        self._group_roles_cache = TTLCache(ttl=self.GROUP_ROLES_TTL)
+        self._user_id_cache = TTLCache(ttl=self.USER_ID_TTL)
+        self.rate_limiter = RateLimiter(self.REQUESTS_PER_SECOND)
+        self.controller = AIMDController("Roblox", max_limit=self.MAX_CONCURRENT_REQUESTS)
+
+    async def _get_json(self, url: str, what: str) -> Any:
+        """GET a Roblox endpoint, returning the decoded JSON or None on failure."""
+        if self.controller.is_open:
+            return None
+        # Take a token before a concurrency slot so that time spent waiting
+        # on the rate limit does not count as upstream latency
+        await self.rate_limiter.acquire()
+        # Roblox may have asked us to back off while we waited for a token
+        if self.controller.is_open:
+            return None
+        try:
+            async with self.controller.slot():
+                async with self.session.get(url) as resp:
+                    if _is_overloaded(resp):
+                        self.controller.trip(_retry_after(resp))
+                    if resp.status != 200:
+                        logging.error("Roblox %s failed: HTTP %s", what, resp.status)
+                        return None
+                    try:
+                        return orjson.loads(await resp.read())
+                    except Exception:
+                        logging.exception("Failed to parse Roblox %s response", what)
+                        return None
+        except CircuitOpenError:
+            return None
 
     async def get_user_id(self, username: str) -> Optional[int]:
         """Resolve a Roblox username to a user ID.
 
         Returns None if the user does not exist.
         """
+        return await self._user_id_cache.get_or_fetch(
+            username.lower(), lambda: self._fetch_user_id(username)
+        )
+
+    async def _fetch_user_id(self, username: str) -> Optional[int]:
         url = self.USER_BY_USERNAME_URL.format(username=username)
-        async with self.session.get(url) as resp:
-            if resp.status != 200:
-                logging.error("Roblox username lookup failed: HTTP %s", resp.status)
-                return None
-            try:
-                data = await resp.json()
-            except Exception:
-                logging.exception("Failed to parse Roblox username response")
-                return None
-            return data.get("Id")
+        data = await self._get_json(url, "username lookup")
+        return data.get("Id") if data else None
 
     async def get_group_role(self, user_id: int, group_id: int) -> Optional[Dict[str, Any]]:
         """Return the user's role information within the specified group.
 
         If the user is not in the group, returns None.
         """
+        groups = await self._group_roles_cache.get_or_fetch(
+            str(user_id), lambda: self._fetch_groups(user_id)
+        )
+        for group in groups or []:
+            if group.get("group", {}).get("id") == group_id:
+                return group
+        return None
+
+    async def _fetch_groups(self, user_id: int) -> Optional[List[Dict[str, Any]]]:
         url = self.GROUP_ROLES_URL.format(user_id=user_id)
-        async with self.session.get(url) as resp:
-            if resp.status != 200:
-                logging.error("Roblox group roles lookup failed: HTTP %s", resp.status)
-                return None
-            try:
-                data = await resp.json()
-            except Exception:
-                logging.exception("Failed to parse Roblox group roles response")
-                return None
-            groups = data.get("data", [])
-            for group in groups:
-                if group.get("group", {}).get("id") == group_id:
-                    return group
-            return None
+        data = await self._get_json(url, "group roles lookup")
+        return data.get("data", []) if data else None
 
 
 ###############################################################################
 # Discord bot
 ###############################################################################
 
+# Maximum length of an embed description
+EMBED_DESCRIPTION_LIMIT = 4096
+
+# Number of processed log entries remembered per log type for de-duplication
+SEEN_LOG_LIMIT = 10000
+
+
+# Cached in place of a member who is not in the guild, since TTLCache does
+# not store None
+_NOT_A_MEMBER = object()
+
+
+def _mark_seen(seen: "OrderedDict[Tuple[Any, ...], None]", key: Tuple[Any, ...]) -> bool:
+    """Add `key` to a bounded insertion-ordered set.
+
+    Returns False if the key was already present.  Once the set grows past
+    `SEEN_LOG_LIMIT` the oldest keys are forgotten.
+    """
+    if key in seen:
+        return False
+    seen[key] = None
+    if len(seen) > SEEN_LOG_LIMIT:
+        seen.popitem(last=False)
+    return True
+
+
+def _format_timestamp(timestamp: float) -> str:
+    """Format an ERLC Unix timestamp as a UTC ISO 8601 string."""
+    return datetime.utcfromtimestamp(timestamp).isoformat(timespec="seconds")
+
+
+def _chunk_lines(lines: List[str], limit: int) -> List[str]:
+    """Join lines with newlines into chunks of at most `limit` characters."""
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in lines:
+        line = line[:limit]
+        if current and size + 1 + len(line) > limit:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        size += len(line) + (1 if current else 0)
+        current.append(line)
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
 class ERLCDiscordBot(commands.Bot):
     """Main bot class tying together ERLC, Discord and Roblox integrations."""
 
     def __init__(self) -> None:
-        # Configure intents: we need access to member information and message content
+        # Configure intents: we need message content.  The privileged members
+        # intent is deliberately left off; the few members we need are
+        # fetched on demand (see _get_member).
         intents = Intents.default()
         intents.message_content = True
-        intents.members = True
-        super().__init__(command_prefix="!", intents=intents)
+        # Guilds still arrive via GUILD_CREATE; never download full member
+        # lists at startup, even if the members intent is turned back on
+        super().__init__(command_prefix="!", intents=intents, chunk_guilds_at_startup=False)
 
         # Read mandatory environment variables
         try:
@@ -354,23 +914,47 @@ class ERLCDiscordBot(commands.Bot):
         self.kill_channel_id = int(os.environ.get("KILL_LOG_CHANNEL_ID", 0))
         self.mod_channel_id = int(os.environ.get("MOD_LOG_CHANNEL_ID", 0))
 
-        # HTTP session used by both API clients
-        self.http_session: aiohttp.ClientSession = aiohttp.ClientSession()
+        # HTTP session and database connections are opened in setup_hook,
+        # once the event loop is running
+        self.http_session: Optional[aiohttp.ClientSession] = None
+        self.db: Optional[SQLitePool] = None
+        self.shift_writer: Optional[ShiftLogWriter] = None
+
+        # In-memory mirror of linked_accounts keyed by Roblox ID, so join
+        # events can be matched to Discord users without a query
+        self._link_by_roblox = LinkIndex()
+        # Members fetched over REST for team checks, keyed by Discord ID
+        self._member_cache = TTLCache(ttl=300, maxsize=1024)
+
+        # Keys of log entries already announced, oldest first
+        self._seen_join_logs: "OrderedDict[Tuple[Any, ...], None]" = OrderedDict()
+        self._seen_kill_logs: "OrderedDict[Tuple[Any, ...], None]" = OrderedDict()
+
+    async def setup_hook(self) -> None:
+        """Called automatically by discord.py when the bot is ready to set up."""
+        # Open the shared database connections (creates the schema if needed)
+        self.db = await SQLitePool.open()
+        self._link_by_roblox = await load_link_index(self.db)
+        self.shift_writer = ShiftLogWriter(self.db)
+        self.shift_writer.start()
+        # One HTTP session shared by both API clients.  The per-host limit
+        # keeps a burst of Roblox lookups from starving the ERLC poll.
+        self.http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=32,
+                limit_per_host=8,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            ),
+            timeout=aiohttp.ClientTimeout(total=15),
+            json_serialize=lambda obj: orjson.dumps(obj).decode(),
+        )
         self.erlc_client = ERLCClient(
             server_id=self.erlc_server_id,
             server_key=self.erlc_server_key,
             session=self.http_session,
         )
         self.roblox_client = RobloxClient(session=self.http_session)
-
-        # Maintain last processed timestamps
-        self.last_join_log_time: Optional[datetime] = None
-        self.last_kill_log_time: Optional[datetime] = None
-
-    async def setup_hook(self) -> None:
-        """Called automatically by discord.py when the bot is ready to set up."""
-        # Initialise persistent storage
-        await init_db()
         # Sync slash commands to the guild to avoid global propagation delay
         guild_obj = discord.Object(id=self.guild_id)
         await self.tree.sync(guild=guild_obj)
@@ -380,7 +964,12 @@ class ERLCDiscordBot(commands.Bot):
     async def close(self) -> None:
         """Clean up tasks and resources on shutdown."""
         self.poll_erlc_logs.cancel()
-        await self.http_session.close()
+        if self.http_session is not None:
+            await self.http_session.close()
+        if self.shift_writer is not None:
+            await self.shift_writer.close()
+        if self.db is not None:
+            await self.db.close()
         await super().close()
 
     ###########################################################################
@@ -403,7 +992,8 @@ class ERLCDiscordBot(commands.Bot):
             )
             return
         # Persist the link
-        await link_account(interaction.user.id, roblox_id, username)
+        await link_account(self.db, interaction.user.id, roblox_id, username)
+        self._link_by_roblox.add(interaction.user.id, roblox_id)
         # Optionally check the user's role within the Roblox group
         msg = f"Successfully linked your Discord account to Roblox user **{username}** (ID: {roblox_id})."
         if self.roblox_group_id:
@@ -418,7 +1008,7 @@ class ERLCDiscordBot(commands.Bot):
     async def shift_start(self, interaction: discord.Interaction) -> None:
         """Record the start of a shift for the invoking user."""
         await interaction.response.defer(ephemeral=True)
-        await start_shift(interaction.user.id)
+        await self.shift_writer.start_shift(interaction.user.id)
         await interaction.followup.send("Your shift has been started.",
                                         ephemeral=True)
 
@@ -426,10 +1016,43 @@ class ERLCDiscordBot(commands.Bot):
     async def shift_end(self, interaction: discord.Interaction) -> None:
         """Record the end of a shift for the invoking user."""
         await interaction.response.defer(ephemeral=True)
-        await end_shift(interaction.user.id)
+        await self.shift_writer.end_shift(interaction.user.id)
         await interaction.followup.send("Your shift has been ended.",
                                         ephemeral=True)
 
+    async def import_links(self, rows: Iterable[Tuple[int, int, str]]) -> None:
+        """Bulk-link `(discord_id, roblox_id, roblox_username)` rows.
+
+        Rows are stored with `link_accounts_bulk` and mirrored in the
+        in-memory reverse index, just like links made with `/link`.
+        """
+        rows = list(rows)
+        await link_accounts_bulk(self.db, rows)
+        for discord_id, roblox_id, _ in rows:
+            self._link_by_roblox.add(int(discord_id), roblox_id)
+
+    async def _get_member(self, guild: discord.Guild, discord_id: int) -> Optional[Member]:
+        """Return a guild member, fetching it over REST if it is not cached.
+
+        Without the members intent the gateway does not keep the member list,
+        so members are fetched when needed and cached for a few minutes.
+        Users who are not in the guild are cached too, so a linked player who
+        left the Discord server is not re-fetched on every join.
+        """
+        member = guild.get_member(discord_id)
+        if member:
+            return member
+        member = await self._member_cache.get_or_fetch(
+            discord_id, lambda: self._fetch_member(guild, discord_id)
+        )
+        return None if member is _NOT_A_MEMBER else member
+
+    async def _fetch_member(self, guild: discord.Guild, discord_id: int) -> Any:
+        try:
+            return await guild.fetch_member(discord_id)
+        except discord.NotFound:
+            return _NOT_A_MEMBER
+
     ###########################################################################
     # Background tasks
     ###########################################################################
@@ -437,13 +1060,20 @@ class ERLCDiscordBot(commands.Bot):
     @tasks.loop(seconds=30)
     async def poll_erlc_logs(self) -> None:
         """Poll the ERLC server for join/leave and kill logs and dispatch them to Discord."""
-        # Join logs
         try:
-            join_logs = await self.erlc_client.join_logs()
-            if join_logs is not None:
+            # The two endpoints are independent, so fetch them concurrently
+            join_logs, kill_logs = await asyncio.gather(
+                self.erlc_client.join_logs(),
+                self.erlc_client.kill_logs(),
+                return_exceptions=True,
+            )
+            if isinstance(join_logs, Exception):
+                logging.error("Failed to fetch ERLC join logs", exc_info=join_logs)
+            elif join_logs is not None:
                 await self._handle_join_logs(join_logs)
-            kill_logs = await self.erlc_client.kill_logs()
-            if kill_logs is not None:
+            if isinstance(kill_logs, Exception):
+                logging.error("Failed to fetch ERLC kill logs", exc_info=kill_logs)
+            elif kill_logs is not None:
                 await self._handle_kill_logs(kill_logs)
         except Exception:
             logging.exception("Error while polling ERLC logs")
@@ -452,119 +1082,185 @@ class ERLCDiscordBot(commands.Bot):
     async def before_poll(self) -> None:
         await self.wait_until_ready()
 
+    async def _send_batched(self, channel_id: int, lines: List[str]) -> None:
+        """Post log lines to a channel as one embed per 4096 characters.
+
+        Discord rate limits messages per channel, so a burst of events sent
+        one message each would take several seconds to drain.
+        """
+        if not lines:
+            return
+        channel = self.get_channel(channel_id)
+        if not channel:
+            return
+        for description in _chunk_lines(lines, EMBED_DESCRIPTION_LIMIT):
+            await channel.send(embed=discord.Embed(description=description))
+
     async def _handle_join_logs(self, logs: List[Dict[str, Any]]) -> None:
         """Process join and leave logs from ERLC."""
-        sorted_logs = sorted(logs, key=lambda l: l.get("timestamp", 0))
-        for log in sorted_logs:
-            ts = datetime.fromtimestamp(log.get("timestamp", 0))
-            if self.last_join_log_time and ts <= self.last_join_log_time:
-                continue
-            self.last_join_log_time = ts
+        join_lines: List[str] = []
+        leave_lines: List[str] = []
+        joined: List[Tuple[str, str]] = []
+        pending: List[Awaitable[Any]] = []
+        # ERLC log entries carry no ID of their own; "id" is the player's
+        new_logs = [
+            log
+            for log in logs
+            if _mark_seen(self._seen_join_logs, (log.get("timestamp"), log.get("id"), log.get("type")))
+        ]
+        new_logs.sort(key=lambda l: l.get("timestamp", 0))
+        for log in new_logs:
             username = log.get("username")
             user_id = str(log.get("id"))
             event_type = log.get("type")  # "join" or "leave"
             if event_type == "join" and self.join_channel_id:
-                channel = self.get_channel(self.join_channel_id)
-                if channel:
-                    await channel.send(
-                        f"**{username}** (ID {user_id}) joined the server at {ts.isoformat()}."
-                    )
-                # Enforce team restrictions for the new player
-                await self._enforce_team_restrictions(username, user_id)
+                when = _format_timestamp(log.get("timestamp", 0))
+                join_lines.append(f"**{username}** (ID {user_id}) joined the server at {when}.")
+                joined.append((username, user_id))
             elif event_type == "leave" and self.leave_channel_id:
-                channel = self.get_channel(self.leave_channel_id)
-                if channel:
-                    await channel.send(
-                        f"**{username}** (ID {user_id}) left the server at {ts.isoformat()}."
-                    )
+                when = _format_timestamp(log.get("timestamp", 0))
+                leave_lines.append(f"**{username}** (ID {user_id}) left the server at {when}.")
+        # Enforce team restrictions for new players with a linked account,
+        # fetching the player list once for all of them
+        to_check = [(username, user_id) for username, user_id in joined if user_id in self._link_by_roblox]
+        if to_check and self.role_team_map:
+            # The entries are already marked seen, so a failed fetch must not
+            # stop this poll's announcements below; just skip the checks
+            try:
+                players = await self.erlc_client.players() or []
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                logging.exception("Failed to fetch ERLC players for team checks")
+                players = []
+            players_by_id = {str(p.get("id")): p for p in players}
+            for username, user_id in to_check:
+                pending.append(self._enforce_team_restrictions(username, user_id, players_by_id))
+        pending.append(self._send_batched(self.join_channel_id, join_lines))
+        pending.append(self._send_batched(self.leave_channel_id, leave_lines))
+        # Announcements and team checks are independent of each other
+        for result in await asyncio.gather(*pending, return_exceptions=True):
+            if isinstance(result, Exception):
+                logging.error("Failed to process ERLC join log", exc_info=result)
 
     async def _handle_kill_logs(self, logs: List[Dict[str, Any]]) -> None:
         """Process kill logs from ERLC."""
-        sorted_logs = sorted(logs, key=lambda l: l.get("timestamp", 0))
-        for log in sorted_logs:
-            ts = datetime.fromtimestamp(log.get("timestamp", 0))
-            if self.last_kill_log_time and ts <= self.last_kill_log_time:
-                continue
-            self.last_kill_log_time = ts
+        lines: List[str] = []
+        new_logs = [
+            log
+            for log in logs
+            if _mark_seen(
+                self._seen_kill_logs,
+                (log.get("timestamp"), log.get("killer_username"), log.get("killed_username")),
+            )
+        ]
+        if not self.kill_channel_id:
+            return
+        new_logs.sort(key=lambda l: l.get("timestamp", 0))
+        for log in new_logs:
             killer = log.get("killer_username")
             victim = log.get("killed_username")
-            if self.kill_channel_id:
-                channel = self.get_channel(self.kill_channel_id)
-                if channel:
-                    await channel.send(
-                        f"**{killer}** eliminated **{victim}** at {ts.isoformat()}."
-                    )
+            when = _format_timestamp(log.get("timestamp", 0))
+            lines.append(f"**{killer}** eliminated **{victim}** at {when}.")
+        await self._send_batched(self.kill_channel_id, lines)
 
-    async def _enforce_team_restrictions(self, username: str, roblox_id: str) -> None:
-        """Ensure that a player is on an authorised team based on their Discord roles."""
+    async def _enforce_team_restrictions(
+        self, username: str, roblox_id: str, players_by_id: Dict[str, Dict[str, Any]]
+    ) -> None:
+        """Ensure that a player is on an authorised team based on their Discord roles.
+
+        `players_by_id` is the current ERLC player list keyed by Roblox ID.
+        """
         # Find the Discord member linked to this Roblox account
-        async with aiosqlite.connect(DB_PATH) as db:
-            async with db.execute(
-                "SELECT discord_id FROM linked_accounts WHERE roblox_id = ?",
-                (str(roblox_id),),
-            ) as cursor:
-                row = await cursor.fetchone()
-                if not row:
-                    return
-                discord_id = int(row[0])
+        discord_id = self._link_by_roblox.get(str(roblox_id))
+        if discord_id is None:
+            return
+        # Determine player's current team
+        player = players_by_id.get(str(roblox_id))
+        current_team = player.get("team") if player else None
+        if not current_team:
+            return
+        # Check mapping; only the first matching restriction applies
+        required_role = next(
+            (
+                role_name
+                for role_name, team_name in self.role_team_map.items()
+                if team_name.lower() == current_team.lower()
+            ),
+            None,
+        )
+        if required_role is None:
+            return
+        # Only restricted teams need the member's roles, which may cost a
+        # REST call
         guild = self.get_guild(self.guild_id)
         if not guild:
             return
-        member = guild.get_member(discord_id)
+        member = await self._get_member(guild, discord_id)
         if not member:
             return
-        # Determine player's current team
-        players = await self.erlc_client.players()
-        current_team = None
-        if players:
-            for p in players:
-                if str(p.get("id")) == str(roblox_id):
-                    current_team = p.get("team")
-                    break
-        if not current_team:
+        if any(r.name == required_role for r in member.roles):
             return
-        # Check mapping
-        for role_name, team_name in self.role_team_map.items():
-            if team_name.lower() == current_team.lower():
-                has_required_role = any(r.name == role_name for r in member.roles)
-                if not has_required_role:
-                    # Inform moderators
-                    if self.mod_channel_id:
-                        mod_channel = self.get_channel(self.mod_channel_id)
-                        if mod_channel:
-                            await mod_channel.send(
-                                f"⚠️ **{member.display_name}** attempted to join team **{current_team}** "
-                                f"without possessing the required Discord role **{role_name}**."
-                            )
-                    # Attempt to move the user back to the civilian team
-                    await self.erlc_client.run_command(f"team {username} civilian")
-                break  # Only apply the first matching restriction
+        # Inform moderators
+        if self.mod_channel_id:
+            mod_channel = self.get_channel(self.mod_channel_id)
+            if mod_channel:
+                await mod_channel.send(
+                    f"⚠️ **{member.display_name}** attempted to join team **{current_team}** "
+                    f"without possessing the required Discord role **{required_role}**."
+                )
+        # Attempt to move the user back to the civilian team
+        await self.erlc_client.run_command(f"team {username} civilian")
 
 
 ###############################################################################
 # FastAPI dashboard
 ###############################################################################
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Hold the database pool for the lifetime of the API server."""
+    app.state.db = await SQLitePool.open()
+    try:
+        yield
+    finally:
+        await app.state.db.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 @app.get("/api/shifts")
-async def get_shifts() -> JSONResponse:
-    """Expose shift logs via a simple JSON API for external dashboards."""
-    shifts: List[Dict[str, Any]] = []
-    async with aiosqlite.connect(DB_PATH) as db:
-        async with db.execute(
-            "SELECT discord_id, start_time, end_time FROM shift_logs ORDER BY start_time DESC"
-        ) as cursor:
-            async for discord_id, start_time, end_time in cursor:
-                shifts.append(
-                    {
-                        "discord_id": discord_id,
-                        "start_time": start_time,
-                        "end_time": end_time,
-                    }
-                )
-    return JSONResponse(content=shifts)
+async def get_shifts(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+) -> StreamingResponse:
+    """Expose shift logs via a simple JSON API for external dashboards.
+
+    Rows are streamed straight from the database cursor as a JSON array, so
+    memory use stays flat no matter how many shifts have been recorded.  Use
+    `limit` and `offset` to page through the results.
+    """
+    pool: SQLitePool = request.app.state.db
+
+    async def rows() -> AsyncIterator[bytes]:
+        yield b"["
+        async with pool.read() as db:
+            # SQLite treats a negative LIMIT as "no limit"
+            params = (-1 if limit is None else limit, offset)
+            async with db.execute(SQL_LIST_SHIFTS, params) as cursor:
+                separator = b""
+                async for discord_id, start_time, end_time in cursor:
+                    yield separator + orjson.dumps(
+                        {
+                            "discord_id": discord_id,
+                            "start_time": start_time,
+                            "end_time": end_time,
+                        }
+                    )
+                    separator = b","
+        yield b"]"
+
+    return StreamingResponse(rows(), media_type="application/json")
 
 
 def main() -> None:
@@ -584,7 +1280,11 @@ def main() -> None:
         for task in pending:
             task.cancel()
 
-    asyncio.run(runner())
+    # The API server runs inside this loop too, so both sides benefit
+    if uvloop is not None:
+        uvloop.run(runner())
+    else:
+        asyncio.run(runner())
 
 
 if __name__ == "__main__":